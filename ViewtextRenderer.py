@@ -23,6 +23,18 @@ class ViewtextRenderer:
             (255,   255,    255)    # White
             )
 
+    # Set-After control codes, which take effect from the following character.
+    # All other control codes are Set-At.
+    SET_AFTER = (
+            0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07,     # Alpha Colour
+            0x08,                                               # Flash
+            0x0A, 0x0B,                                         # End Box, Start Box
+            0x0D, 0x0E, 0x0F,                                   # Double Height/Width/Size
+            0x10, 0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0x17,     # Mosaic Colour
+            0x1B,                                               # Escape
+            0x1F                                                # Release Mosaic
+            )
+
     def __init__(self, font="bedstead", fontsize=20, antialias=True):
         pygame.freetype.init()
 
@@ -46,6 +58,10 @@ class ViewtextRenderer:
         self._lineh = lineh
         self._charw = linew / self.VTCOLS
 
+        # Cache of the last page rendered -- see render()
+        self._lastKey = None
+        self._lastSurfaces = None
+
     def _charmap_bedstead(self, cha, dhrow, mosaic, separated):
         """
         Private: map character set -- for Bedstead font
@@ -181,63 +197,55 @@ class ViewtextRenderer:
             return chr(ofs + cha)
 
 
-    def render(self, data, reveal=True):
+    @classmethod
+    def decode(cls, data, reveal=True, dhbreak=False):
         """
-        Render Viewtext
+        Decode Viewtext attributes
 
         data:    40x25 2D array containing Viewtext character data.
-                 This is essentially the Viewtext/Teletext RAM buffer.
         reveal:  True if the REVEAL button has been pressed.
                  Makes CONCEALed screen elements visible.
-
-        Returns a tuple:
-            (solid, blink)
-            solid:  pygame Surface with flashing elements drawn
-            blink:  pygame Surface with flashing elements blanked
-
-        To draw the Viewtext page correctly, the two frames should be drawn
-        on screen alternately with a delay of around 1.7 seconds between
-        page 'switches'. This will make flashing text flash.
-
-        TODO: Page control bits
+        dhbreak: True to stop decoding the second row of a double-height
+                 row at the first Double Height code. Used when the
+                 double-height font draws both rows at once.
+
+        Generator which yields one tuple per character cell:
+            (cx, cy, cha, fg, bg, flash, box, dhrow, mosaic, sep, ctrl)
+            cx, cy:  column and row of the cell
+            cha:     character code to display (0x20-0x7F), or None for a
+                     blank cell -- a control code without Hold Mosaic, or a
+                     CONCEALed character. Control codes with Hold Mosaic
+                     on are replaced by the held mosaic.
+            fg, bg:  foreground and background colours, from COLOURMAP
+            flash:   True if the cell flashes
+            box:     True if the cell is inside a box
+            dhrow:   0 = normal height
+                     1 = double-height row 1
+                     2 = double-height row 2
+            mosaic:  True if cha is a mosaic character
+            sep:     True for separated mosaic
+            ctrl:    the control code in this cell, or None if the cell
+                     holds a displayable character. See SET_AFTER.
+
+        This is shared by all the renderers, so they only need to handle
+        drawing.
         """
 
-        def flushTextBuf():
-            # Flush the text buffer
-            # This saves us repeating ourselves in the enclosing function
-            if doubleheight and self._font2 is not None:
-                ts = self._font2.render(s, self._antialias, fg, bg)
-            else:
-                ts = self._font.render(s, self._antialias, fg, bg)
-
-            surface1.blit(ts, (cx, cy))
-            if not flash:
-                surface2.blit(ts, (cx, cy))
-
-        # create two blank output surfaces -- Flash A and Flash B
-        surface1 = pygame.Surface((self._surfw, self._surfh))
-        surface2 = pygame.Surface((self._surfw, self._surfh))
-
         # Set start of page conditions
-        #   Reset X/Y position to (0,0)
         #   Disable double-height
-        cx = 0
-        cy = 0
         dhrow = 0
+        cy = 0
 
-        # Start rendering the data
         for row in data:
-            s = ''              # string buffer
-
             # Set start of line condition
             # White text, black background
-            fg              = self.COLOURMAP[7]
-            bg              = self.COLOURMAP[0]
+            fg              = cls.COLOURMAP[7]
+            bg              = cls.COLOURMAP[0]
             # Flash off
             flash           = False
             # Double Height off
             doubleheight    = False
-            # Box off -- TODO add page flag
+            # Box off
             box             = False
             # Conceal off
             conceal         = False
@@ -260,7 +268,15 @@ class ViewtextRenderer:
             # Save the previous row (see above re. ETS 300 706 handling of double-height)
             prevRow = row
 
-            for col in row:
+            def blank():
+                # Cell to display in place of a control character: the held
+                # mosaic if Hold Mosaic is on, otherwise a space
+                if holdMosaic and not (conceal and not reveal):
+                    return (holdMosaicCh, True, holdMosaicSep)
+                else:
+                    return (None, False, False)
+
+            for cx, col in enumerate(row):
                 # Mask off the MSB (sometimes set in image files)
                 col &= 0x7F
 
@@ -270,30 +286,16 @@ class ViewtextRenderer:
 
                     # Deal with Set-After codes, which take effect from the
                     # following character.
-                    if col <= 0x07 or \
-                            (col >= 0x10 and col <= 0x17) or \
-                            col in (0x08, 0x0A, 0x0B, 0x0D, 0x0E, 0x0F, 0x1B, 0x1F):
-                        # this is a set-after code, preload a blank
-                        if holdMosaic:
-                            if conceal and not reveal:
-                                s = s + ' '
-                            elif doubleheight:
-                                s = s + self.mapper(holdMosaicCh, dhrow, True, holdMosaicSep)
-                            else:
-                                s = s + self.mapper(holdMosaicCh, 0, True, holdMosaicSep)
-                        else:
-                            s = s + ' '
+                    if col in cls.SET_AFTER:
+                        # this is a set-after code, display a blank with the
+                        # current attributes
+                        (cha, cmosaic, csep) = blank()
+                        yield (cx, cy, cha, fg, bg, flash, box,
+                                dhrow if doubleheight else 0, cmosaic, csep, col)
                         setAfter = True
                     else:
                         setAfter = False
 
-                    # Flush the text buffer
-                    flushTextBuf()
-
-                    # Update X position and clear output buffer
-                    cx += (self._charw * len(s))
-                    s = ''
-
                     # Control code handling
 
                     if (col <= 0x07) or (col >= 0x10 and col <= 0x17):
@@ -301,8 +303,8 @@ class ViewtextRenderer:
                                         # 0x10 to 0x17: Mosaic Colour (Set-After)
                         # TODO: Alpha Black only takes effect on some decoders (see ETSI ETS 300 706)
                         #       What does Teletext Level 1 spec say we should do here?
-                        if (col != 0 and col != 0x10) or self.FEAT_FG_BLACK:
-                            fg = self.COLOURMAP[col & 0x07]
+                        if (col != 0 and col != 0x10) or cls.FEAT_FG_BLACK:
+                            fg = cls.COLOURMAP[col & 0x07]
 
                             if (mosaic != (col >= 0x10)):
                                 # The "Held-Mosaic" character is reset to "SPACE" at the start of each
@@ -319,10 +321,10 @@ class ViewtextRenderer:
                         flash = False
 
                     elif col == 0x0A:   # 0x0A: End Box (Set-After)
-                        box = False     # TODO
+                        box = False
 
                     elif col == 0x0B:   # 0x0B: Start Box (Set-After)
-                        box = True      # TODO
+                        box = True
 
                     elif col == 0x0C:   # 0x0C: Normal size (Set-At)
                         if doubleheight:
@@ -340,9 +342,10 @@ class ViewtextRenderer:
                             dhrow = 1
                         doubleheight = True
 
-                        # If we're using the Bedstead font and this is line 2, we need to stop rendering at the first
+                        # If the renderer has already drawn this row as part of
+                        # the double-height row above, stop at the first
                         # instance of the Double Height code.
-                        if self._font2 is not None and dhrow == 2:
+                        if dhbreak and dhrow == 2:
                             break
 
                     # 0x0E: Level 2.5 and 3.5: Double Width (Set-After) -- TODO
@@ -362,7 +365,7 @@ class ViewtextRenderer:
                     # TODO: 0x1B / Escape
 
                     elif col == 0x1C:   # 0x1C: Black Background (Set-At)
-                        bg = self.COLOURMAP[0]
+                        bg = cls.COLOURMAP[0]
 
                     elif col == 0x1D:   # 0x1D: New Background (Set-At)
                         bg = fg
@@ -373,18 +376,12 @@ class ViewtextRenderer:
                     elif col == 0x1F:   # 0x1F: Hold Mosaic off (Set-At)
                         holdMosaic = False
 
-                    # If this was a Set-At code, load a space with the new
-                    # attributes into the buffer
+                    # If this was a Set-At code, display a blank with the new
+                    # attributes
                     if not setAfter:
-                        if holdMosaic:
-                            if conceal and not reveal:
-                                s = s + ' '
-                            elif doubleheight:
-                                s = s + self.mapper(holdMosaicCh, dhrow, True, holdMosaicSep)
-                            else:
-                                s = s + self.mapper(holdMosaicCh, 0, True, holdMosaicSep)
-                        else:
-                            s = s + ' '
+                        (cha, cmosaic, csep) = blank()
+                        yield (cx, cy, cha, fg, bg, flash, box,
+                                dhrow if doubleheight else 0, cmosaic, csep, col)
 
                 else:   # not col < 0x20
                     if (not doubleheight) and dhrow == 2:
@@ -396,20 +393,126 @@ class ViewtextRenderer:
 
                     # text character
                     if conceal and not reveal:
-                        s = s + ' '
-                    elif doubleheight:
-                        s = s + self.mapper(col, dhrow, mosaic, sepMosaic)
+                        yield (cx, cy, None, fg, bg, flash, box,
+                                dhrow if doubleheight else 0, False, False, None)
                     else:
-                        s = s + self.mapper(col, 0, mosaic, sepMosaic)
+                        yield (cx, cy, col, fg, bg, flash, box,
+                                dhrow if doubleheight else 0, mosaic, sepMosaic, None)
+
+            cy += 1
+
 
-            if len(s) > 0:
-                # There are characters left in the buffer -- render them
+    def render(self, data, reveal=True, overlay=False):
+        """
+        Render Viewtext
+
+        data:    40x25 2D array containing Viewtext character data.
+                 This is essentially the Viewtext/Teletext RAM buffer.
+        reveal:  True if the REVEAL button has been pressed.
+                 Makes CONCEALed screen elements visible.
+        overlay: True to render in Subtitle/Newsflash mode. Only the
+                 areas between Start Box and End Box are drawn; the rest
+                 of the page is transparent.
+
+        Returns a tuple:
+            (solid, blink)
+            solid:  pygame Surface with flashing elements drawn
+            blink:  pygame Surface with flashing elements blanked
+
+        To draw the Viewtext page correctly, the two frames should be drawn
+        on screen alternately with a delay of around 1.7 seconds between
+        page 'switches'. This will make flashing text flash.
+
+        In overlay mode the returned Surfaces have per-pixel alpha, and can
+        be blitted straight onto a video frame.
+
+        The most recently rendered page is cached. If the page data and
+        options haven't changed since the last call, the same Surfaces are
+        returned without re-rendering, so this can be called every video
+        frame.
+
+        TODO: Page control bits
+        """
+
+        key = (tuple(bytes(row) for row in data), reveal, overlay)
+        if key == self._lastKey:
+            return self._lastSurfaces
+
+        def flushTextBuf():
+            # Flush the text buffer
+            # This saves us repeating ourselves in the enclosing function
+            if overlay and not box:
+                # Outside a box -- leave transparent
+                return
+
+            if doubleheight and self._font2 is not None:
+                ts = self._font2.render(s, self._antialias, fg, bg)
+            else:
+                ts = self._font.render(s, self._antialias, fg, bg)
+
+            surface1.blit(ts, (cx, cy))
+            if not flash:
+                surface2.blit(ts, (cx, cy))
+
+        # create two blank output surfaces -- Flash A and Flash B
+        # Overlay surfaces start out fully transparent
+        flags = pygame.SRCALPHA if overlay else 0
+        surface1 = pygame.Surface((self._surfw, self._surfh), flags)
+        surface2 = pygame.Surface((self._surfw, self._surfh), flags)
+
+        # The Bedstead double-height font draws both rows of a double-height
+        # row at once, so the second row stops at the Double Height code
+        cells = self.decode(data, reveal, dhbreak=(self._font2 is not None))
+
+        # Start rendering the data
+        #   Reset X/Y position to (0,0)
+        cx = 0
+        cy = 0
+        s = ''              # string buffer
+        row = None
+        for (col, line, cha, cfg, cbg, cflash, cbox, dhrow, mosaic, sep, ctrl) in cells:
+            if line != row:
+                if len(s) > 0:
+                    # There are characters left in the buffer -- render them
+                    flushTextBuf()
+
+                # Reset X/Y position to the start of the following line
+                row = line
+                cy = self._lineh * row
+                cx = 0
+                s = ''
+
+            if ctrl is not None and ctrl not in self.SET_AFTER:
+                # Set-At code: flush the text buffer before the new
+                # attributes take effect
+                if len(s) > 0:
+                    flushTextBuf()
+
+                # Update X position and clear output buffer
+                cx += (self._charw * len(s))
+                s = ''
+
+            # All the characters in the buffer share the same attributes
+            (fg, bg, flash, box, doubleheight) = (cfg, cbg, cflash, cbox, dhrow != 0)
+
+            if cha is None:
+                s = s + ' '
+            else:
+                s = s + self.mapper(cha, dhrow, mosaic, sep)
+
+            if ctrl in self.SET_AFTER:
+                # Set-After code: the blank is drawn with the old attributes,
+                # then the text buffer is flushed
                 flushTextBuf()
 
+                # Update X position and clear output buffer
+                cx += (self._charw * len(s))
+                s = ''
 
-            # Reset X/Y position to the start of the following line
-            cy += self._lineh
-            cx = 0
+        if len(s) > 0:
+            # There are characters left in the buffer -- render them
+            flushTextBuf()
 
+        self._lastKey = key
+        self._lastSurfaces = (surface1,surface2)
         return (surface1,surface2)
-
@@ -0,0 +1,142 @@
+import pygame
+
+from ViewtextRenderer import ViewtextRenderer
+
+class ViewtextThumbnailer:
+    """
+    Fast low-resolution Viewtext renderer for page previews
+
+    Each character cell is drawn as a 2x3 block of pixels -- one pixel per
+    mosaic sixel -- coloured from the decoded foreground and background
+    colours. Alphanumeric characters are drawn as a blend of the foreground
+    and background colours, weighted towards the foreground. No fonts are
+    loaded, so this is much faster than rendering a full-size page with
+    ViewtextRenderer and scaling it down.
+
+    Attributes are decoded by ViewtextRenderer.decode(), so thumbnails use
+    the same colour map and feature settings as full-size renders.
+    """
+
+    # Viewtext screen area in characters
+    VTCOLS  = ViewtextRenderer.VTCOLS
+    VTLINES = ViewtextRenderer.VTLINES
+
+    # Size of a character cell in pixels (one pixel per sixel)
+    CELLW = 2
+    CELLH = 3
+
+    # Sixel bit masks for each pixel in a mosaic cell, by (y, x)
+    SIXELS = (
+            (0x01, 0x02),   # top row
+            (0x04, 0x08),   # middle row
+            (0x10, 0x40)    # bottom row
+            )
+
+    # Sixel rows to draw for each pixel row in a cell, indexed by dhrow
+    #   0 = normal height
+    #   1 = double-height row 1 (top half of the mosaic)
+    #   2 = double-height row 2 (bottom half of the mosaic)
+    DHROWMAP = (
+            (0, 1, 2),
+            (0, 0, 1),
+            (1, 2, 2)
+            )
+
+    def __init__(self, scale=1):
+        """
+        scale:   integer scale factor applied to each thumbnail
+                 (nearest-neighbour, so sixels stay sharp)
+        """
+        self._scale = scale
+        self._pixw = self.VTCOLS * self.CELLW
+        self._pixh = self.VTLINES * self.CELLH
+        self._surfw = self._pixw * scale
+        self._surfh = self._pixh * scale
+
+    def size(self):
+        """
+        Return the size of a single thumbnail as a (width, height) tuple
+        """
+        return (self._surfw, self._surfh)
+
+    def render(self, data, reveal=True):
+        """
+        Render a Viewtext page as a thumbnail
+
+        data:    40x25 2D array containing Viewtext character data.
+        reveal:  True to make CONCEALed screen elements visible.
+
+        Returns a pygame Surface. Flashing elements are drawn, and boxing
+        is ignored.
+        """
+
+        pitch = self._pixw * 3
+        buf = bytearray(pitch * self._pixh)
+
+        # Pixel values for each colour, and for each fg/bg blend
+        colours = {}
+
+        cells = ViewtextRenderer.decode(data[:self.VTLINES], reveal)
+        for (cx, cy, cha, fg, bg, flash, box, dhrow, mosaic, sep, ctrl) in cells:
+            if cx >= self.VTCOLS:
+                continue
+
+            if mosaic and cha is not None and (cha & 0x20):
+                # Mosaic character: one pixel per sixel
+                # Separated mosaics can't be shown at one pixel per sixel,
+                # so they're drawn as contiguous mosaics.
+                f = colours.setdefault(fg, bytes(fg))
+                b = colours.setdefault(bg, bytes(bg))
+                for py, sy in enumerate(self.DHROWMAP[dhrow]):
+                    ofs = ((cy * self.CELLH) + py) * pitch + (cx * self.CELLW * 3)
+                    for mask in self.SIXELS[sy]:
+                        buf[ofs:ofs+3] = f if (cha & mask) else b
+                        ofs += 3
+                continue
+
+            if cha is None or cha == 0x20:
+                c = colours.setdefault(bg, bytes(bg))
+            else:
+                # Alphanumeric character: blend weighted towards the
+                # foreground, so the text colour stays visible
+                c = colours.get((fg, bg))
+                if c is None:
+                    c = bytes(((2 * f) + b) // 3 for f, b in zip(fg, bg))
+                    colours[(fg, bg)] = c
+
+            for py in range(self.CELLH):
+                ofs = ((cy * self.CELLH) + py) * pitch + (cx * self.CELLW * 3)
+                buf[ofs:ofs+(self.CELLW * 3)] = c * self.CELLW
+
+        surface = pygame.image.frombuffer(bytes(buf), (self._pixw, self._pixh), 'RGB')
+        if self._scale != 1:
+            surface = pygame.transform.scale(surface, (self._surfw, self._surfh))
+        return surface
+
+    def contactSheet(self, pages, columns=10, gap=2, background=(64, 64, 64), reveal=True):
+        """
+        Render a collection of Viewtext pages into a single contact sheet
+
+        pages:       list of 40x25 2D arrays containing Viewtext character data
+        columns:     number of thumbnails per row of the sheet
+        gap:         spacing between thumbnails in pixels
+        background:  colour of the gaps between thumbnails
+
+        Returns a pygame Surface. Thumbnails are placed left-to-right, then
+        top-to-bottom, in the order they appear in the list.
+        """
+
+        columns = max(1, min(columns, len(pages)))
+        rows = (len(pages) + columns - 1) // columns
+
+        sheet = pygame.Surface((
+            gap + (columns * (self._surfw + gap)),
+            gap + (rows * (self._surfh + gap))))
+        sheet.fill(background)
+
+        for n, page in enumerate(pages):
+            x = gap + ((n % columns) * (self._surfw + gap))
+            y = gap + ((n // columns) * (self._surfh + gap))
+            sheet.blit(self.render(page, reveal), (x, y))
+
+        return sheet
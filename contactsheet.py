@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import pygame
+
+from ViewtextThumbnail import ViewtextThumbnailer
+from testpages import LoadEP1, LoadRaw
+
+
+parser = argparse.ArgumentParser(description='Render Viewtext pages into a contact sheet')
+parser.add_argument('pages', nargs='+', help='page files (.bin raw or .ep1)')
+parser.add_argument('-o', '--output', default='contactsheet.png', help='output image file')
+parser.add_argument('-c', '--columns', type=int, default=10, help='thumbnails per row')
+parser.add_argument('-s', '--scale', type=int, default=2, help='thumbnail scale factor')
+args = parser.parse_args()
+
+
+# load the pages, skipping any which can't be read
+pages = []
+for filename in args.pages:
+    try:
+        if os.path.splitext(filename)[1].lower() == '.ep1':
+            pages.append(LoadEP1(filename))
+        else:
+            pages.append(LoadRaw(filename))
+    except IOError as e:
+        print("Skipping %s: %s" % (filename, e))
+
+if len(pages) == 0:
+    sys.exit("No pages could be loaded")
+
+thumb = ViewtextThumbnailer(scale=args.scale)
+sheet = thumb.contactSheet(pages, columns=args.columns)
+pygame.image.save(sheet, args.output)
+print("Saved %d pages to %s" % (len(pages), args.output))